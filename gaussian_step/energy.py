@@ -463,9 +463,7 @@ class Energy(Substep):
         data in variables for other stages to access
         """
         if P is None:
-            P = self.parameters.current_values_to_dict(
-                context=seamm.flowchart_variables._data
-            )
+            P = self._P()
 
         if "energy" not in data:
             text = "Gaussian did not produce the energy. Something is wrong!"
@@ -113,6 +113,10 @@ class GaussianParameters(seamm.Parameters):
 
         logger.debug("GaussianParameters.__init__")
 
-        super().__init__(
-            defaults={**GaussianParameters.parameters, **defaults}, data=data
-        )
+        if defaults:
+            defaults = {**GaussianParameters.parameters, **defaults}
+        else:
+            # Used as is; the class parameters are not modified
+            defaults = GaussianParameters.parameters
+
+        super().__init__(defaults=defaults, data=data)
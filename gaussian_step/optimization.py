@@ -3,13 +3,9 @@
 """Setup and run Gaussian"""
 
 import logging
-import textwrap
-
-from tabulate import tabulate
+import re
 
 import gaussian_step
-import seamm
-import seamm.data
 from seamm_util import Q_
 import seamm_util.printing as printing
 from seamm_util.printing import FormattedText as __
@@ -34,6 +30,56 @@ logger = logging.getLogger("Gaussian")
 job = printing.getPrinter()
 printer = printing.getPrinter("gaussian")
 
+# The maximum number of steps given as a multiple of the number of atoms, e.g. 6*nAtoms
+_maxsteps_re = re.compile(r"^\s*(\d+)\s*\*\s*nAtoms\s*$")
+
+# The column label, trajectory and threshold keys for the convergence table
+_conv_keys = tuple(
+    (key, key + " trajectory", key + " threshold")
+    for key in (
+        "maximum atom force",
+        "RMS atom force",
+        "maximum atom displacement",
+        "RMS atom displacement",
+    )
+)
+
+# The Opt subkeyword for each choice of convergence criteria
+_conv = gaussian_step.optimization_convergence
+
+# The Opt subkeyword for each named choice for recalculating the Hessian
+_recalc_map = {
+    "every step": "CalcAll",
+    "at beginning": "CalcFC",
+    "HF at beginning": "CalcHFFC",
+}
+
+
+def _max_steps(value, n_atoms):
+    """The maximum number of optimization steps for the given parameter value.
+
+    Parameters
+    ----------
+    value : str
+        An integer, or a multiple of the number of atoms such as "6*nAtoms".
+    n_atoms : int
+        The number of atoms in the system.
+
+    Returns
+    -------
+    int
+    """
+    match = _maxsteps_re.match(value)
+    if match is not None:
+        return int(match.group(1)) * n_atoms
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(
+            f"The maximum number of steps, '{value}', must be an "
+            "integer or of the form '6*nAtoms'."
+        )
+
 
 class Optimization(gaussian_step.Energy):
     def __init__(
@@ -240,27 +286,23 @@ class Optimization(gaussian_step.Energy):
         if keywords is None:
             keywords = set()
 
+        # Resolve the parameters afresh for this execution of the node
+        self._cached_P = None
+
         _, configuration = self.get_system_configuration()
 
-        P = self.parameters.current_values_to_dict(
-            context=seamm.flowchart_variables._data
-        )
+        P = self._P()
 
         # Set the attribute for writing just the input
         self.input_only = P["input only"]
 
         subkeywords = []
-        convergence = gaussian_step.optimization_convergence[P["geometry convergence"]]
+        convergence = _conv[P["geometry convergence"]]
         if convergence != "":
             subkeywords.append(convergence)
         max_steps = P["max geometry steps"]
         if max_steps != "default":
-            if "nAtoms" in max_steps:
-                n_atoms = configuration.n_atoms
-                max_steps = max_steps.replace("nAtoms", str(n_atoms))
-                max_steps = eval(max_steps)
-            else:
-                max_steps = int(max_steps)
+            max_steps = _max_steps(max_steps, configuration.n_atoms)
             subkeywords.append(f"MaxCycles={max_steps}")
             # Also need to use an IOP to set the max. Odd.
             # https://mattermodeling.stackexchange.com/questions/5087/ (continued)
@@ -318,15 +360,12 @@ class Optimization(gaussian_step.Energy):
             )
 
         elif P["hessian"] == "calculate":
-            if P["recalc hessian"] == "every step":
-                subkeywords.append("CalcAll")
-            elif P["recalc hessian"] == "at beginning":
-                subkeywords.append("CalcFC")
-            elif P["recalc hessian"] == "HF at beginning":
-                subkeywords.append("CalcHFFC")
+            recalc = P["recalc hessian"]
+            if recalc in _recalc_map:
+                subkeywords.append(_recalc_map[recalc])
             else:
                 try:
-                    tmp = int(P["recalc hessian"])
+                    tmp = int(recalc)
                     if tmp < 1:
                         raise ValueError(
                             "The Hessian recalculation interval must be > 0"
@@ -335,7 +374,7 @@ class Optimization(gaussian_step.Energy):
                     raise ValueError(
                         "Calculating the Hessian must either be a keyword or integer."
                     )
-                subkeywords.append(f"RecalcFC={P['recalc hessian']}")
+                subkeywords.append(f"RecalcFC={recalc}")
 
         coordinates = P["coordinates"]
         if "GIC" in coordinates:
@@ -359,9 +398,7 @@ class Optimization(gaussian_step.Energy):
         data in variables for other stages to access
         """
         if P is None:
-            P = self.parameters.current_values_to_dict(
-                context=seamm.flowchart_variables._data
-            )
+            P = self._P()
 
         text = ""
 
@@ -400,19 +437,17 @@ class Optimization(gaussian_step.Energy):
                 printer.normal("")
                 text = ""
 
-                table2 = {}
-                for key in (
-                    "maximum atom force",
-                    "RMS atom force",
-                    "maximum atom displacement",
-                    "RMS atom displacement",
-                ):
-                    if key + " trajectory" not in data:
-                        continue
-                    table2[key] = [f"{v:.6f}" for v in data[key + " trajectory"]]
-                    table2[key].append("-")
-                    table2[key].append(f"{data[key + ' Threshold']:.6f}")
+                fmt = "{:.6f}".format
+                table2 = {
+                    key: [*map(fmt, data[trajectory]), "-", fmt(data[threshold])]
+                    for key, trajectory, threshold in _conv_keys
+                    if trajectory in data and threshold in data
+                }
                 if table2 != {}:
+                    # Only needed in this rare case, so import here
+                    import textwrap
+                    from tabulate import tabulate
+
                     tmp = tabulate(
                         table2,
                         headers="keys",
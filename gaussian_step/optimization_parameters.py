@@ -52,7 +52,7 @@ class OptimizationParameters(gaussian_step.EnergyParameters):
             "default": "default",
             "kind": "string",
             "default_units": "",
-            "enumeration": [x for x in gaussian_step.optimization_convergence],
+            "enumeration": tuple(gaussian_step.optimization_convergence),
             "format_string": "",
             "description": "Convergence criteria:",
             "help_text": "The criteria to use for convergence.",
@@ -141,15 +141,15 @@ class OptimizationParameters(gaussian_step.EnergyParameters):
         """Initialize the instance, by default from the default
         parameters given in the class"""
 
-        super().__init__(
-            defaults={**OptimizationParameters.parameters, **defaults}, data=data
-        )
+        if defaults:
+            defaults = {**OptimizationParameters.parameters, **defaults}
+        else:
+            # Used as is; the class parameters are not modified
+            defaults = OptimizationParameters.parameters
+
+        super().__init__(defaults=defaults, data=data)
 
         # Do any local editing of defaults
         tmp = self["configuration name"]
         tmp._data["enumeration"] = ["optimized with {model}", *tmp.enumeration[1:]]
-        tmp.default = "keep current name"
-
-        tmp = self["configuration name"]
-        tmp._data["enumeration"] = ["optimized with {model}", *tmp.enumeration]
         tmp.default = "optimized with {model}"
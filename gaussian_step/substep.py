@@ -2,12 +2,16 @@
 
 """Setup and run Gaussian"""
 
-from collections import Counter
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 import configparser
 import csv
 from datetime import datetime, timezone
+from functools import lru_cache
 import gzip
 import importlib
+import io
+from itertools import islice
 import json
 import logging
 from math import isnan
@@ -19,6 +23,7 @@ import pprint
 import re
 import shutil
 import string
+import subprocess
 import textwrap
 import time
 
@@ -40,7 +45,6 @@ import seamm_util.printing as printing
 try:
     from itertools import batched
 except ImportError:
-    from itertools import islice
 
     def batched(iterable, n):
         "Batch data into tuples of length n. The last batch may be shorter."
@@ -56,6 +60,19 @@ logger = logging.getLogger("Gaussian")
 job = printing.getPrinter()
 printer = printing.getPrinter("gaussian")
 
+# Fortran drops the E from reals with three-digit exponents, e.g. 1.0-100
+_exp_fix = re.compile(r"([0-9])-")
+
+# The most lines kept while looking for the CBS or Gn summary in the output
+_max_summary_lines = 100
+
+# The header line of a block in a formatted checkpoint file: the name (A40), the
+# type, and either "N=" and the number of values, or the value of a scalar.
+_fchk_header = re.compile(r"^(\S.{39})   ([A-Z])   (?:N=(.{0,12})|.*?)\r?$", re.M)
+
+# The number of values per line for each type of array in a formatted checkpoint file
+_fchk_per_line = {"I": 6, "R": 5, "C": 5, "H": 9, "L": 72}
+
 
 def humanize(memory, suffix="B", kilo=1024):
     """
@@ -77,6 +94,20 @@ def humanize(memory, suffix="B", kilo=1024):
         memory /= kilo
 
 
+_memory_units = {
+    "": 1,
+    "k": 1000,
+    "M": 1000**2,
+    "G": 1000**3,
+    "P": 1000**4,
+    "Ki": 1024,
+    "Mi": 1024**2,
+    "Gi": 1024**3,
+    "Pi": 1024**4,
+}
+
+
+@lru_cache(maxsize=64)
 def dehumanize(memory, suffix="B"):
     """
     Unscale memory from its human readable form e.g:
@@ -84,18 +115,6 @@ def dehumanize(memory, suffix="B"):
         '1.20 MB' => 1200000
         '1.17 GB' => 1170000000
     """
-    units = {
-        "": 1,
-        "k": 1000,
-        "M": 1000**2,
-        "G": 1000**3,
-        "P": 1000**4,
-        "Ki": 1024,
-        "Mi": 1024**2,
-        "Gi": 1024**3,
-        "Pi": 1024**4,
-    }
-
     tmp = memory.split()
     if len(tmp) == 1:
         return memory
@@ -105,13 +124,163 @@ def dehumanize(memory, suffix="B"):
     amount, unit = tmp
     amount = float(amount)
 
-    for prefix in units:
+    for prefix, factor in _memory_units.items():
         if prefix + suffix == unit:
-            return int(amount * units[prefix])
+            return int(amount * factor)
 
     raise ValueError(f"Don't recognize the units on '{memory}'")
 
 
+def _skip_lines(text, pos, n):
+    """The position in the text after the n lines starting at pos.
+
+    The lines of an array in a formatted checkpoint file all have the same width,
+    except perhaps the last, so the end is found from the width of the first line
+    and checked by counting the newlines, falling back to stepping line by line.
+    """
+    if n == 0:
+        return pos
+    eol = text.find("\n", pos)
+    if eol < 0:
+        return len(text)
+    end = text.find("\n", pos + (n - 1) * (eol + 1 - pos))
+    end = len(text) if end < 0 else end + 1
+    if text.count("\n", pos, end) == n:
+        return end
+    for _ in range(n):
+        eol = text.find("\n", pos)
+        if eol < 0:
+            return len(text)
+        pos = eol + 1
+    return pos
+
+
+# A native gzip, preferring pigz, if one is installed
+_gzip_exe = shutil.which("pigz") or shutil.which("gzip")
+if _gzip_exe is not None and Path(_gzip_exe).name == "pigz":
+    # The files are compressed concurrently, so each pigz uses a single thread
+    _gzip_cmd = (_gzip_exe, "-p", "1", "-f")
+elif _gzip_exe is not None:
+    _gzip_cmd = (_gzip_exe, "-f")
+else:
+    _gzip_cmd = None
+
+
+def _gzip_one(path):
+    """Compress a file with gzip, replacing it with the compressed version.
+
+    The native pigz or gzip is used if available, falling back to Python's gzip
+    module.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        The file to compress. It is replaced by <path>.gz
+
+    Returns
+    -------
+    pathlib.Path or None
+        The compressed file, or None if the compression failed.
+    """
+    out = path.with_suffix(path.suffix + ".gz")
+    if _gzip_cmd is not None:
+        try:
+            subprocess.run([*_gzip_cmd, str(path)], check=True)
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"Could not compress {path}: {e}")
+            return None
+    else:
+        with path.open("rb") as f_in:
+            with gzip.open(out, "wb") as f_out:
+                shutil.copyfileobj(f_in, f_out)
+        path.unlink()
+    return out
+
+
+@lru_cache(maxsize=8)
+def _deck_header(keywords, memory, n_threads):
+    """The Link 0 and route lines of the input deck.
+
+    These are the same for every structure run with the same model, so are cached.
+
+    Parameters
+    ----------
+    keywords : (str)
+        The sorted route keywords.
+    memory : str
+        The memory for Gaussian, e.g. '800MB'
+    n_threads : int
+        The number of shared-memory processors to use.
+    """
+    return (
+        "%Chk=gaussian.chk",
+        f"%Mem={memory}",
+        f"%NProcShared={n_threads}",
+        "# " + " ".join(keywords),
+        "# Punch=(Coord,Derivatives)",
+    )
+
+
+@lru_cache(maxsize=16)
+def _gaussian_citation(bibtex, month, revision, year):
+    """The bibtex citation for a specific release of Gaussian.
+
+    Parameters
+    ----------
+    bibtex : str
+        The template for the citation, with $month, $version and $year.
+    month, revision, year : str
+        The release of Gaussian.
+    """
+    return string.Template(bibtex).substitute(month=month, version=revision, year=year)
+
+
+def _returned_text(result, filename):
+    """The text of a file returned by the executor, or None if not available.
+
+    Parameters
+    ----------
+    result : dict
+        The result from executor.run, or None
+    filename : str
+        The name of the returned file.
+    """
+    if result is None or filename not in result:
+        return None
+    text = result[filename]["data"]
+    return text if isinstance(text, str) else None
+
+
+def _text_stream(text):
+    """A seekable text stream over a string.
+
+    Unlike io.StringIO, which holds 4 bytes per character, this keeps one encoded
+    copy and decodes it in chunks as it is read.
+    """
+    return io.TextIOWrapper(io.BytesIO(text.encode()), encoding="utf-8")
+
+
+def _list_to_python(value):
+    """Convert a list of NumPy arrays to nested lists.
+
+    Arrays of the same shape and type are stacked and converted in one call.
+    """
+    if len(value) > 0 and isinstance(value[0], np.ndarray):
+        shape = value[0].shape
+        dtype = value[0].dtype
+        if all(
+            isinstance(v, np.ndarray) and v.shape == shape and v.dtype == dtype
+            for v in value
+        ):
+            return np.stack(value).tolist()
+        return [i.tolist() for i in value]
+    return value
+
+
+# Converters from the types in the cclib results to plain Python
+_to_python = {np.ndarray: np.ndarray.tolist, list: _list_to_python}
+
+
 _subscript = {
     "0": "\N{SUBSCRIPT ZERO}",
     "1": "\N{SUBSCRIPT ONE}",
@@ -191,6 +360,11 @@ class Substep(seamm.Node):
         )
 
         self._input_only = False
+        # Cache of the resolved control parameters for a single execution
+        self._cached_P = None
+        self._cached_ctx_id = None
+        # Cache of the Gaussian configuration and environment for the run
+        self._cached_config = None
         self._timing_data = []
         self._timing_path = Path("~/.seamm.d/timing/gaussian.csv").expanduser()
 
@@ -242,6 +416,19 @@ class Substep(seamm.Node):
         """The semantic version of this module."""
         return gaussian_step.__version__
 
+    def _P(self):
+        """The current values of the control parameters, cached for this run.
+
+        The values are resolved against the flowchart variables once and reused
+        until the cache is cleared at the start of the next run, or the variable
+        context changes.
+        """
+        context = seamm.flowchart_variables._data
+        if self._cached_P is None or id(context) != self._cached_ctx_id:
+            self._cached_P = self.parameters.current_values_to_dict(context=context)
+            self._cached_ctx_id = id(context)
+        return self._cached_P
+
     @property
     def git_revision(self):
         """The git version of this module."""
@@ -708,9 +895,7 @@ class Substep(seamm.Node):
 
     def cleanup(self):
         """Perform any requested cleanup at the end of the calculation."""
-        P = self.parameters.current_values_to_dict(
-            context=seamm.flowchart_variables._data
-        )
+        P = self._P()
         handling = P["file handling"]
         if handling == "keep all":
             pass
@@ -723,12 +908,162 @@ class Substep(seamm.Node):
             directory = Path(self.directory)
             shutil.rmtree(directory)
 
+    def _n_threads(self, ce):
+        """The number of cores that Gaussian and its tools may use.
+
+        This honors the parallelism and number of cores requested for this step
+        and globally, as well as the cores this process is allowed to run on.
+
+        Parameters
+        ----------
+        ce : dict
+            The computational environment from seamm_exec.
+
+        Returns
+        -------
+        int
+            The number of threads or concurrent processes to use.
+        """
+        options = self.options
+        seamm_options = self.global_options
+
+        n_cores = ce["NTASKS"]
+        self.logger.debug("The number of cores available is {}".format(n_cores))
+
+        if seamm_options["parallelism"] not in ("openmp", "any"):
+            return 1
+
+        if options["ncores"] == "available":
+            n_threads = n_cores
+        else:
+            n_threads = int(options["ncores"])
+        if n_threads > n_cores:
+            n_threads = n_cores
+        if n_threads < 1:
+            n_threads = 1
+        if seamm_options["ncores"] != "available":
+            n_threads = min(n_threads, int(seamm_options["ncores"]))
+        # Nor more than the cores this process may run on, e.g. in a cpuset
+        # on a shared node. Child processes inherit this affinity.
+        if hasattr(os, "sched_getaffinity"):
+            n_threads = min(n_threads, len(os.sched_getaffinity(0)))
+        return n_threads
+
+    def _gaussian_config(self, executor):
+        """The configuration and environment for running Gaussian and its tools.
+
+        The configuration is read from gaussian.ini, which is created from the
+        defaults or the installed Gaussian if needed. The result is cached until
+        the start of the next run.
+
+        Parameters
+        ----------
+        executor : seamm_exec.Executor
+            The executor that will run Gaussian.
+
+        Returns
+        -------
+        (dict, dict)
+            The configuration for the executor and the environment variables.
+        """
+        executor_type = executor.name
+        if self._cached_config is not None and self._cached_config[0] == executor_type:
+            _, config, env = self._cached_config
+            return dict(config), dict(env)
+
+        # Read configuration file for Gaussian if it exists
+        seamm_options = self.global_options
+        full_config = configparser.ConfigParser()
+        ini_dir = Path(seamm_options["root"]).expanduser()
+        path = ini_dir / "gaussian.ini"
+
+        # If the config file doesn't exist, get the default
+        if not path.exists():
+            resources = importlib.resources.files("gaussian_step") / "data"
+            ini_text = (resources / "gaussian.ini").read_text()
+            txt_config = Configuration(path)
+            txt_config.from_string(ini_text)
+            txt_config.save()
+
+        full_config.read(ini_dir / "gaussian.ini")
+
+        # Getting desperate! Look for an executable in the path
+        if (
+            executor_type not in full_config
+            or "root-directory" not in full_config[executor_type]
+            or "setup-environment" not in full_config[executor_type]
+        ):
+            # See if we can find the Gaussian environment variables
+            if "g16root" in os.environ:
+                g_ver = "g16"
+                root_directory = os.environ["g16root"]
+                if "GAUSS_BSDDIR" in os.environ:
+                    setup_directory = Path(os.environ["GAUSS_BSDDIR"])
+                else:
+                    setup_directory = Path(root_directory) / g_ver / "bsd"
+            elif "g09root" in os.environ:
+                g_ver = "g09"
+                root_directory = os.environ["g09root"]
+                if "GAUSS_BSDDIR" in os.environ:
+                    setup_directory = Path(os.environ["GAUSS_BSDDIR"])
+                else:
+                    setup_directory = Path(root_directory) / g_ver / "bsd"
+            else:
+                root_directory = None
+                exe_path = shutil.which("g16")
+                if exe_path is None:
+                    exe_path = shutil.which("g09")
+                if exe_path is None:
+                    raise RuntimeError(
+                        f"No section for '{executor_type}' in Gaussian ini file"
+                        f" ({ini_dir / 'gaussian.ini'}), nor in the defaults, "
+                        "nor in the path!"
+                    )
+                g_ver = exe_path.name
+                root_directory = str(exe_path.parent.parent)
+                setup_directory = Path(root_directory) / g_ver / "bsd"
+            setup_environment = str(setup_directory / f"{g_ver}.profile")
+
+            txt_config = Configuration(path)
+
+            if not txt_config.section_exists(executor_type):
+                txt_config.add_section(executor_type)
+
+            txt_config.set_value(executor_type, "installation", "local")
+            txt_config.set_value(executor_type, "code", g_ver)
+            txt_config.set_value(executor_type, "root-directory", root_directory)
+            txt_config.set_value(executor_type, "setup-environment", setup_environment)
+            txt_config.save()
+            full_config.read(ini_dir / "gaussian.ini")
+
+        config = dict(full_config.items(executor_type))
+        # Use the matching version of the seamm-gaussian image by default.
+        config["version"] = self.version
+
+        g_ver = config["code"]
+
+        # Setup the calculation environment definition
+        if config["root-directory"] != "":
+            env = {f"{g_ver}root": config["root-directory"]}
+        else:
+            env = {}
+
+        if "scratch-dir" in config and config["scratch-dir"] != "":
+            path = Path(config["scratch-dir"])
+            try:
+                path.mkdir(parents=True, exist_ok=True)
+            except Exception:
+                pass
+            else:
+                env["GAUSS_SCRDIR"] = config["scratch-dir"]
+
+        self._cached_config = (executor_type, config, env)
+        return dict(config), dict(env)
+
     def get_functional(self, P=None):
         """Work out the DFT functional"""
         if P is None:
-            P = self.parameters.current_values_to_dict(
-                context=seamm.flowchart_variables._data
-            )
+            P = self._P()
         if P["level"] == "recommended":
             functional = P["functional"]
         else:
@@ -757,9 +1092,7 @@ class Substep(seamm.Node):
         """The method ... HF, DFT, ... used."""
         # Figure out the method.
         if P is None:
-            P = self.parameters.current_values_to_dict(
-                context=seamm.flowchart_variables._data
-            )
+            P = self._P()
         if P["level"] == "recommended":
             method_string = P["method"]
         else:
@@ -794,9 +1127,7 @@ class Substep(seamm.Node):
         text = "\n\n"
 
         directory = Path(self.directory)
-        P = self.parameters.current_values_to_dict(
-            context=seamm.flowchart_variables._data
-        )
+        P = self._P()
 
         # Get the configuration and basic information
         system, configuration = self.get_system_configuration(None)
@@ -814,60 +1145,19 @@ class Substep(seamm.Node):
         # Prepare to run
         executor = self.parent.flowchart.executor
 
-        # Read configuration file for Gaussian
-        seamm_options = self.global_options
-        ini_dir = Path(seamm_options["root"]).expanduser()
-        full_config = configparser.ConfigParser()
-        full_config.read(ini_dir / "gaussian.ini")
-        executor_type = executor.name
-        if executor_type not in full_config:
-            raise RuntimeError(
-                f"No section for '{executor_type}' in MOPAC ini file "
-                f"({ini_dir / 'mopac.ini'})"
-            )
-        config = dict(full_config.items(executor_type))
-
-        # Set up the environment
-        if config["root-directory"] != "":
-            env = {"g09root": config["root-directory"]}
-        else:
-            env = {}
-
-        if config["setup-environment"] != "":
-            cmd = [". {setup-environment} && cubegen"]
-        else:
-            cmd = ["cubegen"]
+        # The configuration and environment used to run Gaussian
+        config, env = self._gaussian_config(executor)
 
         npts = "-2"
 
-        keys = []
+        # The CUBEGEN jobs to run, as (cube filename, arguments)
+        jobs = []
         if P["total density"]:
-            keys.append("total density")
+            filename = "Total_Density.cube"
+            jobs.append((filename, f"1 Density=SCF gaussian.fchk {filename} {npts} h"))
         if spin_polarized and P["total spin density"]:
-            keys.append("spin density")
-
-        n_errors = 0
-        for key in keys:
-            if key == "total density":
-                args = f"1 Density=SCF gaussian.fchk Total_Density.cube {npts} h"
-            elif key == "spin density":
-                args = f"1 Spin=SCF gaussian.fchk Spin_Density.cube {npts} h"
-
-            # And run CUBEGEN
-            result = executor.run(
-                cmd=[*cmd, args],
-                config=config,
-                directory=self.directory,
-                files={},
-                return_files=["*"],
-                in_situ=True,
-                shell=True,
-                env=env,
-            )
-            if not result:
-                self.logger.error("There was an error running CubeGen")
-                n_errors += 1
-                printer.important(f"There was an error calling CUBEGEN, {cmd} {args}")
+            filename = "Spin_Density.cube"
+            jobs.append((filename, f"1 Spin=SCF gaussian.fchk {filename} {npts} h"))
 
         # Any requested orbitals
         if P["orbitals"]:
@@ -878,7 +1168,8 @@ class Substep(seamm.Node):
                 if txt == "all":
                     orbitals = [*range(n_orbitals)]
                 else:
-                    orbitals = []
+                    # A set, so overlapping ranges don't run CUBEGEN twice
+                    orbitals = set()
                     for chunk in txt.split(","):
                         chunk = chunk.strip()
                         if ":" in chunk or ".." in chunk:
@@ -915,7 +1206,10 @@ class Substep(seamm.Node):
                                 else:
                                     last = homo + 1 + last
 
-                            orbitals.extend(range(first, last + 1))
+                            # Only the orbitals within limits
+                            orbitals.update(
+                                range(max(first, 0), min(last + 1, n_orbitals))
+                            )
                         else:
                             first = chunk.strip().upper()
 
@@ -931,14 +1225,9 @@ class Substep(seamm.Node):
                                     first = homo + first
                                 else:
                                     first = homo + 1 + first
-                            orbitals.append(first)
-
-                # Remove orbitals out of limits
-                tmp = orbitals
-                orbitals = []
-                for x in tmp:
-                    if x >= 0 and x < n_orbitals:
-                        orbitals.append(x)
+                            if first >= 0 and first < n_orbitals:
+                                orbitals.add(first)
+                    orbitals = sorted(orbitals)
 
                 if spin_polarized:
                     l1 = ("A", "B")[spin]
@@ -956,35 +1245,56 @@ class Substep(seamm.Node):
                     else:
                         filename = f"{l2}LUMO+{mo - homo - 1}.cube"
                     args = f"1 {l1}MO={mo + 1} gaussian.fchk {filename} {npts} h"
+                    jobs.append((filename, args))
 
-                    # And run CUBEGEN
-                    result = executor.run(
-                        cmd=[*cmd, args],
-                        config=config,
-                        directory=self.directory,
-                        files={},
-                        return_files=["*"],
-                        in_situ=True,
-                        shell=True,
-                        env=env,
+        # Run the CUBEGEN jobs concurrently, in batches of up to the number of cores
+        # allowed for this step
+        n_errors = 0
+        if len(jobs) > 0:
+            ce = seamm_exec.computational_environment()
+            n_workers = max(1, min(self._n_threads(ce), len(jobs)))
+            batches = [
+                " & ".join(f"cubegen {args}" for _, args in batch) + " & wait"
+                for batch in batched(jobs, n_workers)
+            ]
+            cmd = "( " + " ; ".join(batches) + " )"
+            if config["setup-environment"] != "":
+                cmd = ". {setup-environment} && " + cmd
+
+            result = executor.run(
+                cmd=[cmd],
+                config=config,
+                directory=self.directory,
+                files={},
+                return_files=["*"],
+                in_situ=True,
+                shell=True,
+                env=env,
+            )
+            if not result:
+                self.logger.error("There was an error running CubeGen")
+                printer.important(f"There was an error calling CUBEGEN, {cmd}")
+
+            # Each job that did not produce its cube file failed
+            for filename, args in jobs:
+                if not (directory / filename).exists():
+                    self.logger.error(f"CubeGen did not create {filename}")
+                    n_errors += 1
+                    printer.important(
+                        f"There was an error calling CUBEGEN, cubegen {args}"
                     )
-                    if not result:
-                        self.logger.error("There was an error running CubeGen")
-                        n_errors += 1
-                        printer.important(
-                            f"There was an error calling CUBEGEN, {cmd} {args}"
-                        )
 
-        # Finally rename and gzip the cube files
+        # Finally gzip the cube files, in parallel since there may be many. The
+        # work is done in gzip or zlib, outside the GIL, so threads suffice.
         n_processed = 0
-        paths = directory.glob("*.cube")
-        for path in paths:
-            out = path.with_suffix(".cube.gz")
-            with path.open("rb") as f_in:
-                with gzip.open(out, "wb") as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            n_processed += 1
-            path.unlink()
+        paths = [*directory.glob("*.cube")]
+        if len(paths) > 0:
+            ce = seamm_exec.computational_environment()
+            n_workers = max(1, min(self._n_threads(ce), len(paths)))
+            with ThreadPoolExecutor(max_workers=n_workers) as pool:
+                for out in pool.map(_gzip_one, paths):
+                    if out is not None:
+                        n_processed += 1
         if n_errors > 0:
             text += (
                 f"Created {n_processed} density and orbital cube files, but there were "
@@ -995,67 +1305,93 @@ class Substep(seamm.Node):
 
         return text
 
-    def parse_fchk(self, path, data={}):
+    def parse_fchk(self, path, data=None, text=None):
         """Process the data of a formatted Chk file given as lines of data.
 
+        The blocks of data are first located from their header lines, without
+        converting any values, and then decoded.
+
         Parameters
         ----------
         path : pathlib.Path
             The path to the checkpoint file
+        data : dict = None
+            The data to add the results to, in place. By default a new dictionary.
+        text : str = None
+            The contents of the file, if already in memory, to avoid rereading it.
         """
-        lines = path.read_text().splitlines()
-
-        if len(lines) < 2:
+        if data is None:
+            data = {}
+        if text is None:
+            text = path.read_text()
+
+        # Ignore first potentially truncated title line. Type line is (A10,A30,A30)
+        start = text.find("\n") + 1
+        if start == 0 or start == len(text):
             return data
-
-        it = iter(lines)
-        # Ignore first potentially truncated title line
-        next(it)
-
-        # Type line (A10,A30,A30)
-        line = next(it)
+        end = text.find("\n", start)
+        if end < 0:
+            end = len(text)
+        line = text[start:end].rstrip("\r")
         data["calculation"] = line[0:10].strip()
         data["method"] = line[10:40].strip()
 
         # The rest of the file consists of a line defining the data.
-        # If the data is a scalar, it is on the control line, otherwise it follows
+        # If the data is a scalar, it is on the control line, otherwise it follows.
+        # First find each block from its header, and the text holding its data from
+        # the number of values. Character data can look like a header, so the lines
+        # of data are skipped rather than searched for the next header.
         translation = self.metadata["translation"]
-        while True:
-            try:
-                line = next(it)
-            except StopIteration:
-                break
+        blocks = []
+        pos = end + 1
+        n_chars = len(text)
+        while pos < n_chars:
+            m = _fchk_header.match(text, pos)
+            if m is None:
+                eol = text.find("\n", pos)
+                pos = n_chars if eol < 0 else eol + 1
+                continue
+            pos = m.end() + 1
+            key = m[1].strip()
+            if key in translation:
+                key = translation[key]
+            code = m[2]
+            if m[3] is not None:
+                try:
+                    count = int(m[3].strip())
+                except ValueError:
+                    continue
+                if code in _fchk_per_line:
+                    n = (count + _fchk_per_line[code] - 1) // _fchk_per_line[code]
+                else:
+                    n = 0
+                block_end = _skip_lines(text, pos, n)
+                blocks.append((key, code, count, None, text[pos:block_end]))
+                pos = block_end
+            else:
+                blocks.append((key, code, None, m[0].rstrip("\r"), None))
+
+        # And then decode the blocks
+        for key, code, count, line, block in blocks:
             try:
-                key = line[0:40].strip()
-                if key in translation:
-                    key = translation[key]
-                code = line[43]
-                is_array = line[47:49] == "N="
-                if is_array:
-                    count = int(line[49:61].strip())
+                if count is not None:
                     value = []
                     if code == "I":
-                        i = 0
-                        while i < count:
-                            line = next(it)
-                            for pos in range(0, 6 * 12, 12):
-                                value.append(int(line[pos : pos + 12].strip()))
-                                i += 1
-                                if i == count:
-                                    break
+                        # 6 integers per line, parsed in bulk by NumPy
+                        value = np.fromstring(block, dtype=np.int64, sep=" ")[:count]
+                        if len(value) < count:
+                            raise ValueError(f"Too few values for {key}")
+                        value = value.tolist()
                     elif code == "R":
-                        i = 0
-                        while i < count:
-                            line = next(it)
-                            for pos in range(0, 5 * 16, 16):
-                                text = line[pos : pos + 16].strip()
-                                # Fortran drops E in format for large exponents...
-                                text = re.sub(r"([0-9])-", r"\1E-", text)
-                                value.append(float(text))
-                                i += 1
-                                if i == count:
-                                    break
+                        # 5 reals per line, parsed in bulk by NumPy
+                        # Fortran drops E in format for large exponents...
+                        block = _exp_fix.sub(r"\1E-", block)
+                        value = np.fromstring(block, dtype=np.float64, sep=" ")[:count]
+                        if len(value) < count:
+                            raise ValueError(f"Too few values for {key}")
+                        value = value.tolist()
                     elif code == "C":
+                        it = iter(block.splitlines())
                         value = ""
                         i = 0
                         while i < count:
@@ -1067,6 +1403,7 @@ class Substep(seamm.Node):
                                     break
                                 value = value.rstrip()
                     elif code == "H":
+                        it = iter(block.splitlines())
                         value = ""
                         i = 0
                         while i < count:
@@ -1078,158 +1415,300 @@ class Substep(seamm.Node):
                                     break
                                 value = value.rstrip()
                     elif code == "L":
-                        i = 0
-                        while i < count:
-                            line = next(it)
-                            for pos in range(72):
-                                value.append(line[pos] == "T")
-                                i += 1
-                                if i == count:
-                                    break
+                        # 72 logicals per line, compared in bulk by NumPy
+                        block = "".join(line[:72] for line in block.splitlines())
+                        value = np.frombuffer(block.encode("ascii"), dtype=np.uint8)
+                        if len(value) < count:
+                            raise ValueError(f"Too few values for {key}")
+                        value = (value[:count] == ord("T")).tolist()
                 else:
                     if code == "I":
                         value = int(line[49:].strip())
                     elif code == "R":
-                        value = float(line[49:].strip())
+                        value = float(_exp_fix.sub(r"\1E-", line[49:].strip()))
                     elif code == "C":
                         value = line[49:].strip()
                     elif code == "L":
                         value = line[49] == "T"
+                    else:
+                        continue
                 data[key] = value
             except Exception:
                 pass
         return data
 
-    def parse_output(self, path, data={}):
+    def parse_output(self, path, data=None, text=None):
         """Process the output.
 
+        The log file is streamed and scanned once, remembering only the last
+        complete thermochemistry, CBS, and Gn sections rather than holding the
+        whole file in memory.
+
         Parameters
         ----------
         path : pathlib.Path
             The Gaussian log file.
+        data : dict = None
+            The data to add the results to, in place. By default a new dictionary.
+        text : str = None
+            The contents of the file, if already in memory, to avoid rereading it.
         """
-        P = self.parameters.current_values_to_dict(
-            context=seamm.flowchart_variables._data
-        )
+        if data is None:
+            data = {}
 
-        lines = path.read_text().splitlines()
-
-        # Did it end properly?
-        data["success"] = "Normal termination" in lines[-1]
-
-        # Find the date and version of Gaussian
-        # Gaussian 09:  EM64M-G09RevE.01 30-Nov-2015
-        it = iter(lines)
-        for line in it:
-            if "Cite this work" in line:
-                for line in it:
-                    if "**********************" in line:
-                        line = next(it)
-                        if "Gaussian" in line:
-                            try:
-                                _, version, revision, date = line.split()
-                                _, month, year = date.split("-")
-                                revision = revision.split("Rev")[1]
-                                data["G revision"] = revision
-                                data["G version"] = f"G{version.strip(':')}"
-                                data["G month"] = month
-                                data["G year"] = year
-                            except Exception as e:
-                                self.logger.warning(
-                                    f"Could not find the Gaussian citation: {e}"
-                                )
-                            break
-            elif "AO basis set in the form of general basis input" in line:
-                _, configuration = self.get_system_configuration(None)
-                symbols = configuration.atoms.symbols
-                atnos = configuration.atoms.atomic_numbers
-                tmp = []
-                first = True
-                found = set()
-                keep = True
-                section = {}
-                for line in it:
-                    if "nuclear repulsion energy" in line:
-                        break
-                    if line.strip() == "":
-                        tmp = [section[k] for k in sorted(section.keys())]
-                        pprint.pp(tmp)
-                        data["basis set"] = "\n".join(tmp) + "\n"
-                        break
-                    if first:
-                        first = False
-                        # n is one-based atom number
-                        n, _ = line.strip().split()
-                        n = int(n)
-                        atno = atnos[n - 1]
-                        symbol = symbols[n - 1]
-                        keep = symbol not in found
-                        if keep:
-                            found.add(symbol)
-                            tmp.append(f"-{symbol}")
-                    elif keep:
-                        tmp.append(line)
-                    if "****" in line:
-                        if keep:
-                            section[atno] = "\n".join(tmp)
-                        tmp = []
-                        first = True
-
-        # And the optimization steps, if any.
+        P = self._P()
+
+        method, method_data = self.get_method(P)
+
+        # The line ending the CBS or Gn summary, if this is a composite method
+        cbs_match = None
+        gn_match = None
+        if method[0:4] == "CBS-":
+            if method == "CBS-4M":
+                cbs_match = "CBS-4 Enthalpy="
+                cbs_method = "CBS-4"
+            else:
+                cbs_match = f"{method} Enthalpy="
+                cbs_method = method
+            self.logger.debug(f"Looking for '{cbs_match}'")
+        elif method in (
+            "G1",
+            "G2",
+            "G3",
+            "G4",
+            "G2MP2",
+            "G3B3",
+            "G3MP2",
+            "G3MP2B3",
+            "G4MP2",
+        ):
+            if method == "G2":
+                gn_match = "G2MP2 Enthalpy="
+            elif method == "G3B3":
+                gn_match = "G3 Enthalpy="
+                method = "G3"
+            elif method == "G3MP2B3":
+                gn_match = "G3MP2 Enthalpy="
+                method = "G3MP2"
+            else:
+                gn_match = f"{method} Enthalpy="
+
+        # The optimization steps, if any.
         #
         # Need to be careful about end of the first (and presumably only?) optimization.
         # The FORCE calculation prints out the same information about convergence, but
         # may indicate no convergence. This can confuse this code unless we look for the
-        # end of the optimization step and quit then
-        it = iter(lines)
+        # end of the optimization step and ignore any tables after it.
         n_steps = 0
         max_force = []
         rms_force = []
         max_displacement = []
         rms_displacement = []
         converged = None
-        for line in it:
-            if line == "         Item               Value     Threshold  Converged?":
-                n_steps += 1
-                converged = True
-
-                tmp1, tmp2, value, threshold, criterion = next(it).split()
-                if tmp1 == "Maximum" and tmp2 == "Force":
-                    max_force.append(float(value))
-                    data["maximum atom force threshold"] = float(threshold)
-                    if criterion != "YES":
-                        converged = False
-
-                tmp1, tmp2, value, threshold, criterion = next(it).split()
-                if tmp1 == "RMS" and tmp2 == "Force":
-                    rms_force.append(float(value))
-                    data["RMS atom force threshold"] = float(threshold)
-                    if criterion != "YES":
-                        converged = False
-
-                tmp1, tmp2, value, threshold, criterion = next(it).split()
-                if tmp1 == "Maximum" and tmp2 == "Displacement":
-                    max_displacement.append(float(value))
-                    data["maximum atom displacement threshold"] = float(threshold)
-                    if criterion != "YES":
-                        converged = False
-
-                tmp1, tmp2, value, threshold, criterion = next(it).split()
-                if tmp1 == "RMS" and tmp2 == "Displacement":
-                    rms_displacement.append(float(value))
-                    data["RMS atom displacement threshold"] = float(threshold)
-                    if criterion != "YES":
-                        converged = False
-            elif line == " Optimization completed.":
-                line = next(it)
-                if line == "    -- Stationary point found.":
+        opt_done = False
+        opt_header = "         Item               Value     Threshold  Converged?"
+
+        # The last complete sections seen, and any section being collected
+        thermo_text = None
+        thermo_block = None
+        cbs_text = None
+        cbs_block = None
+        gn_text = None
+        gn_block = deque(maxlen=_max_summary_lines)
+
+        def collect(lines):
+            """Collect the thermochemistry, CBS and Gn sections, keeping the last.
+
+            Every line passes through here, including those consumed by the inner
+            loops below, so no section boundary is missed.
+            """
+            nonlocal thermo_text, thermo_block, cbs_text, cbs_block, gn_text
+            for line in lines:
+                line = line.rstrip("\n")
+
+                if "- Thermochemistry -" in line:
+                    thermo_block = []
+                if thermo_block is not None:
+                    thermo_block.append(line)
+                    if "Sum of electronic and thermal Free Energies=" in line:
+                        thermo_text = thermo_block
+                        thermo_block = None
+
+                if cbs_match is not None:
+                    if "Complete Basis Set" in line:
+                        cbs_block = []
+                    if cbs_block is not None:
+                        cbs_block.append(line)
+                        if cbs_match in line:
+                            cbs_text = cbs_block
+                            cbs_block = None
+                        elif len(cbs_block) > _max_summary_lines:
+                            # Too long to be the summary, e.g. a mention in the input
+                            cbs_block = None
+
+                # Gn calculations have no header, just a block after a blank line
+                if gn_match is not None:
+                    if line.strip() == "":
+                        gn_block.clear()
+                    else:
+                        gn_block.append(line)
+                        if gn_match in line:
+                            gn_text = list(gn_block)
+
+                yield line
+
+        line = ""
+        with path.open("r") if text is None else _text_stream(text) as fd:
+            it = collect(fd)
+            for line in it:
+                # Find the date and version of Gaussian
+                # Gaussian 09:  EM64M-G09RevE.01 30-Nov-2015
+                if "Cite this work" in line:
+                    for line in it:
+                        if "**********************" in line:
+                            line = next(it)
+                            if "Gaussian" in line:
+                                try:
+                                    _, version, revision, date = line.split()
+                                    _, month, year = date.split("-")
+                                    revision = revision.split("Rev")[1]
+                                    data["G revision"] = revision
+                                    data["G version"] = f"G{version.strip(':')}"
+                                    data["G month"] = month
+                                    data["G year"] = year
+                                except Exception as e:
+                                    self.logger.warning(
+                                        f"Could not find the Gaussian citation: {e}"
+                                    )
+                                break
+                elif "AO basis set in the form of general basis input" in line:
+                    _, configuration = self.get_system_configuration(None)
+                    symbols = configuration.atoms.symbols
+                    atnos = configuration.atoms.atomic_numbers
+                    tmp = []
+                    first = True
+                    found = set()
+                    keep = True
+                    section = {}
+                    for line in it:
+                        if "nuclear repulsion energy" in line:
+                            break
+                        if line.strip() == "":
+                            tmp = [section[k] for k in sorted(section.keys())]
+                            data["basis set"] = "\n".join(tmp) + "\n"
+                            break
+                        if first:
+                            first = False
+                            # n is one-based atom number
+                            n, _ = line.strip().split()
+                            n = int(n)
+                            atno = atnos[n - 1]
+                            symbol = symbols[n - 1]
+                            keep = symbol not in found
+                            if keep:
+                                found.add(symbol)
+                                tmp.append(f"-{symbol}")
+                        elif keep:
+                            tmp.append(line)
+                        if "****" in line:
+                            if keep:
+                                section[atno] = "\n".join(tmp)
+                            tmp = []
+                            first = True
+                elif line == opt_header and not opt_done:
+                    n_steps += 1
+                    converged = True
+
+                    line = next(it)
+                    if line.startswith(" Maximum Force"):
+                        value, threshold, criterion = line.partition("Force")[2].split()
+                        max_force.append(float(value))
+                        data["maximum atom force threshold"] = float(threshold)
+                        if criterion != "YES":
+                            converged = False
+
+                    line = next(it)
+                    if line.startswith(" RMS     Force"):
+                        value, threshold, criterion = line.partition("Force")[2].split()
+                        rms_force.append(float(value))
+                        data["RMS atom force threshold"] = float(threshold)
+                        if criterion != "YES":
+                            converged = False
+
+                    line = next(it)
+                    if line.startswith(" Maximum Displacement"):
+                        tail = line.partition("Displacement")[2]
+                        value, threshold, criterion = tail.split()
+                        max_displacement.append(float(value))
+                        data["maximum atom displacement threshold"] = float(threshold)
+                        if criterion != "YES":
+                            converged = False
+
+                    line = next(it)
+                    if line.startswith(" RMS     Displacement"):
+                        tail = line.partition("Displacement")[2]
+                        value, threshold, criterion = tail.split()
+                        rms_displacement.append(float(value))
+                        data["RMS atom displacement threshold"] = float(threshold)
+                        if criterion != "YES":
+                            converged = False
+                elif line == " Optimization completed." and not opt_done:
+                    opt_done = True
+                    line = next(it)
+                    if line == "    -- Stationary point found.":
+                        converged = True
+                    else:
+                        self.logger.warning(f"Optimization completed: {line}")
+                elif line == "    -- Stationary point found." and not opt_done:
+                    opt_done = True
                     converged = True
-                else:
-                    self.logger.warning(f"Optimization completed: {line}")
-                break
-            elif line == "    -- Stationary point found.":
-                converged = True
-                break
+
+                # The Wiberg bond orders ... which look like this:
+
+                # Wiberg bond index matrix in the NAO basis:
+                #
+                #     Atom    1       2       3       4       5       6       7    ...
+                #     ---- ------  ------  ------  ------  ------  ------  ------  ...
+                #   1.  C  0.0000  1.8962  0.0134  0.1327  0.9261  0.9249  0.0071  ...
+                #   2.  C  1.8962  0.0000  1.1131  0.0127  0.0044  0.0049  0.9112  ...
+                #  ...
+                #  10.  H  0.0002  0.0022  0.0049  0.9269  0.0000  0.0002  0.0015  ...
+                #
+                #     Atom   10
+                #     ---- ------
+                #   1.  C  0.0002
+                #   2.  C  0.0022
+                #  ...
+                if line.startswith(" Wiberg bond index matrix in the NAO basis:"):
+                    n_atoms = None
+                    bond_orders = []
+                    next(it)
+                    # Read each chunk of output
+                    while True:
+                        # Skip the two header lines
+                        next(it)
+                        next(it)
+                        count = 0
+                        # And add the data to the bond_order matrix
+                        for line in it:
+                            line = line.strip()
+                            if line == "":
+                                if n_atoms is None:
+                                    n_atoms = count
+                                break
+                            count += 1
+                            vals = [float(val) for val in line.split()[2:]]
+                            if len(bond_orders) < count:
+                                bond_orders.append(vals)
+                            else:
+                                bond_orders[count - 1].extend(vals)
+                        if len(bond_orders[0]) >= n_atoms:
+                            break
+
+                    data["Wiberg bond order matrix"] = bond_orders
+
+        # Did it end properly? The loop variable is left holding the last line read.
+        data["success"] = "Normal termination" in line
 
         data["N steps optimization"] = n_steps
 
@@ -1244,23 +1723,9 @@ class Substep(seamm.Node):
         data["maximum atom displacement trajectory"] = max_displacement
         data["RMS atom displacement trajectory"] = rms_displacement
 
-        method, method_data = self.get_method(P)
-
-        # Look for thermochemistry output. Composite methods may override some values
-        text = []
-        found = False
-        for line in reversed(lines):
-            if "Sum of electronic and thermal Free Energies=" in line:
-                found = True
-                text.append(line)
-            elif found:
-                text.append(line)
-                if "- Thermochemistry -" in line:
-                    break
-
-        if found:
-            it = iter(reversed(text))
-            for line in it:
+        # Thermochemistry output. Composite methods may override some values
+        if thermo_text is not None:
+            for line in thermo_text:
                 if "Rotational symmetry number" in line:
                     tmp = line.split()[3].rstrip(".")
                     data["symmetry number"] = int(tmp)
@@ -1302,63 +1767,42 @@ class Substep(seamm.Node):
         # CBS-4 (0 K)=               -78.439921 CBS-4 Energy=                 -78.436908
         # CBS-4 Enthalpy=            -78.435964 CBS-4 Free Energy=            -78.460753
 
-        self.logger.debug(f"Checking for CBS extrapolation for {method}")
-        if method[0:4] == "CBS-":
-            # Need last section
-            if method == "CBS-4M":
-                match = "CBS-4 Enthalpy="
-                tmp_method = "CBS-4"
-            else:
-                match = f"{method} Enthalpy="
-                tmp_method = method
-            self.logger.debug(f"Looking for '{match}'")
-            text = []
-            found = False
-            for line in reversed(lines):
-                if found:
-                    text.append(line)
-                    if "Complete Basis Set" in line:
-                        break
-                elif match in line:
-                    found = True
-                    text.append(line)
-
-            self.logger.debug(f"Found CBS extrapolation: {found}")
-            if found:
-                translation = self.metadata["translation"]
-                text = text[::-1]
-                it = iter(text)
-                next(it)
-                citations = []
-                for line in it:
-                    tmp = line.strip()
-                    if tmp == "":
-                        break
-                    citations.append(tmp)
-                data["citations"] = citations
+        if cbs_match is not None:
+            self.logger.debug(f"Found CBS extrapolation: {cbs_text is not None}")
+        if cbs_text is not None:
+            translation = self.metadata["translation"]
+            it = iter(cbs_text)
+            next(it)
+            citations = []
+            for line in it:
+                tmp = line.strip()
+                if tmp == "":
+                    break
+                citations.append(tmp)
+            data["citations"] = citations
 
-                for line in it:
-                    line = line.strip()
-                    if len(line) > 40:
-                        part = [line[0:37], line[38:]]
-                    else:
-                        part = [line]
-                    for p in part:
-                        if "=" not in p:
-                            continue
-                        key, value = p.split("=", 1)
-                        key = key.strip()
-                        value = float(value.strip())
-                        if key.startswith(tmp_method):
-                            key = key.split(" ", 1)[1]
-                        key = "Composite/" + key
-                        if key in translation:
-                            key = translation[key]
-                        data[key] = value
-                data["energy"] = data["H 0"] - data["ZPE"]
-                data["U"] = data["energy"] + data["E thermal"]
-                data["model"] = method
-                data["Composite/summary"] = "\n".join(text)
+            for line in it:
+                line = line.strip()
+                if len(line) > 40:
+                    part = [line[0:37], line[38:]]
+                else:
+                    part = [line]
+                for p in part:
+                    if "=" not in p:
+                        continue
+                    key, value = p.split("=", 1)
+                    key = key.strip()
+                    value = float(value.strip())
+                    if key.startswith(cbs_method):
+                        key = key.split(" ", 1)[1]
+                    key = "Composite/" + key
+                    if key in translation:
+                        key = translation[key]
+                    data[key] = value
+            data["energy"] = data["H 0"] - data["ZPE"]
+            data["U"] = data["energy"] + data["E thermal"]
+            data["model"] = method
+            data["Composite/summary"] = "\n".join(cbs_text)
 
         # Gn calculations. No header!!!!!
 
@@ -1370,119 +1814,38 @@ class Substep(seamm.Node):
         # G4(0 K)=                  -78.521880 G4 Energy=                   -78.518825
         # G4 Enthalpy=              -78.517880 G4 Free Energy=              -78.542752
 
-        if method in (
-            "G1",
-            "G2",
-            "G3",
-            "G4",
-            "G2MP2",
-            "G3B3",
-            "G3MP2",
-            "G3MP2B3",
-            "G4MP2",
-        ):
-            # Need last section
-            if method == "G2":
-                match = "G2MP2 Enthalpy="
-            elif method == "G3B3":
-                match = "G3 Enthalpy="
-                method = "G3"
-            elif method == "G3MP2B3":
-                match = "G3MP2 Enthalpy="
-                method = "G3MP2"
-            else:
-                match = f"{method} Enthalpy="
-            text = []
-            found = False
-            for line in reversed(lines):
-                if found:
-                    if line.strip() == "":
-                        break
-                    text.append(line)
-                elif match in line:
-                    found = True
-                    text.append(line)
-
-            if found:
-                translation = self.metadata["translation"]
-                text = text[::-1]
-                for line in text:
-                    line = line.strip()
-                    if len(line) > 36:
-                        part = [line[0:36], line[37:]]
-                    else:
-                        part = [line]
-                    for p in part:
-                        if "=" not in p:
-                            continue
-                        key, value = p.split("=", 1)
-                        key = key.strip()
-                        value = float(value.strip())
-                        if key.startswith(method):
-                            key = key[len(method) :].strip()
-                        elif key == "E(Empiric)":
-                            key = "DE(Empirical)"
-                        key = "Composite/" + key
-                        if key in translation:
-                            key = translation[key]
-                        data[key] = value
-
-                data["energy"] = data["H 0"] - data["ZPE"]
-                data["U"] = data["energy"] + data["E thermal"]
-                data["model"] = method
-                tmp = " " * 20 + f"{method[0:2]} composite method extrapolation\n\n"
-                data["Composite/summary"] = tmp + "\n".join(text)
-
-        # The Wiberg bond orders ... which look like this:
-
-        # Wiberg bond index matrix in the NAO basis:
-        #
-        #     Atom    1       2       3       4       5       6       7       8       9
-        #     ---- ------  ------  ------  ------  ------  ------  ------  ------  -----
-        #   1.  C  0.0000  1.8962  0.0134  0.1327  0.9261  0.9249  0.0071  0.0005  0.00x
-        #   2.  C  1.8962  0.0000  1.1131  0.0127  0.0044  0.0049  0.9112  0.0029  0.01x
-        #  ...
-        #  10.  H  0.0002  0.0022  0.0049  0.9269  0.0000  0.0002  0.0015  0.0171  0.00x
-        #
-        #     Atom   10
-        #     ---- ------
-        #   1.  C  0.0002
-        #   2.  C  0.0022
-        #  ...
-
-        it = iter(lines)
-        for line in it:
-            n_atoms = None
-            if line.startswith(" Wiberg bond index matrix in the NAO basis:"):
-                bond_orders = []
-                next(it)
-                # Read each chunk of output
-                while True:
-                    # Skip the two header lines
-                    next(it)
-                    next(it)
-                    count = 0
-                    # And add the data to the bond_order matrix
-                    for line in it:
-                        line = line.strip()
-                        if line == "":
-                            if n_atoms is None:
-                                n_atoms = count
-                            break
-                        count += 1
-                        vals = [float(val) for val in line.split()[2:]]
-                        if len(bond_orders) < count:
-                            bond_orders.append(vals)
-                        else:
-                            bond_orders[count - 1].extend(vals)
-                    if len(bond_orders[0]) >= n_atoms:
-                        break
+        if gn_text is not None:
+            translation = self.metadata["translation"]
+            for line in gn_text:
+                line = line.strip()
+                if len(line) > 36:
+                    part = [line[0:36], line[37:]]
+                else:
+                    part = [line]
+                for p in part:
+                    if "=" not in p:
+                        continue
+                    key, value = p.split("=", 1)
+                    key = key.strip()
+                    value = float(value.strip())
+                    if key.startswith(method):
+                        key = key[len(method) :].strip()
+                    elif key == "E(Empiric)":
+                        key = "DE(Empirical)"
+                    key = "Composite/" + key
+                    if key in translation:
+                        key = translation[key]
+                    data[key] = value
 
-                data["Wiberg bond order matrix"] = bond_orders
+            data["energy"] = data["H 0"] - data["ZPE"]
+            data["U"] = data["energy"] + data["E thermal"]
+            data["model"] = method
+            tmp = " " * 20 + f"{method[0:2]} composite method extrapolation\n\n"
+            data["Composite/summary"] = tmp + "\n".join(gn_text)
 
         return data
 
-    def parse_punch(self, path, n_atoms, data):
+    def parse_punch(self, path, n_atoms, data, text=None):
         """Digest the Gaussian punch file.
 
         Parameters
@@ -1493,12 +1856,16 @@ class Substep(seamm.Node):
             The number of atoms in the configuration
         data : dict
             The current data for the calculation.
+        text : str = None
+            The contents of the file, if already in memory, to avoid rereading it.
 
         Returns
         -------
         dict
         """
-        lines = path.read_text().splitlines()
+        if text is None:
+            text = path.read_text()
+        lines = text.splitlines()
         n_lines = len(lines)
 
         # Coordinates come first
@@ -1582,26 +1949,18 @@ class Substep(seamm.Node):
 
     def process_data(self, data):
         """Massage the cclib data to a more easily used form."""
-        self.logger.debug(pprint.pformat(data))
-        # Convert numpy arrays to Python lists
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(pprint.pformat(data))
+        # Convert numpy arrays to Python lists, flattening any dictionaries
         new = {}
         for key, value in data.items():
-            if isinstance(value, np.ndarray):
-                new[key] = value.tolist()
-            elif isinstance(value, list):
-                if len(value) > 0 and isinstance(value[0], np.ndarray):
-                    new[key] = [i.tolist() for i in value]
-                else:
-                    new[key] = value
-            elif isinstance(value, dict):
+            if isinstance(value, dict):
                 for k, v in value.items():
-                    newkey = f"{key}/{k}"
-                    if isinstance(v, np.ndarray):
-                        new[newkey] = v.tolist()
-                    else:
-                        new[newkey] = v
+                    convert = _to_python.get(type(v))
+                    new[f"{key}/{k}"] = v if convert is None else convert(v)
             else:
-                new[key] = value
+                convert = _to_python.get(type(value))
+                new[key] = value if convert is None else convert(value)
 
         for key in ("metadata/cpu_time", "metadata/wall_time"):
             if key in new:
@@ -1615,59 +1974,24 @@ class Substep(seamm.Node):
         # Pull out the HOMO and LUMO energies as scalars
         if "homos" in new and "moenergies" in new:
             homos = new["homos"]
-            if len(homos) == 2:
-                for i, letter in enumerate(["alpha", "beta"]):
-                    Es = new["moenergies"][i]
-                    homo = homos[i]
-                    new[f"{letter} HOMO orbital number"] = homo + 1
-                    new[f"E {letter} homo"] = Es[homo]
-                    if homo > 0:
-                        new[f"E {letter} nhomo"] = Es[homo - 1]
-                    if homo + 1 < len(Es):
-                        new[f"E {letter} lumo"] = Es[homo + 1]
-                        new[f"E {letter} gap"] = Es[homo + 1] - Es[homo]
-                    if homo + 2 < len(Es):
-                        new[f"E {letter} slumo"] = Es[homo + 2]
-                    if "mosyms" in new:
-                        syms = new["mosyms"][i]
-                        new[f"{letter} HOMO symmetry"] = syms[homo]
-                        if homo > 0:
-                            new[f"{letter} NHOMO symmetry"] = syms[homo - 1]
-                        if homo + 1 < len(syms):
-                            new[f"{letter} LUMO symmetry)"] = syms[homo + 1]
-                        if homo + 2 < len(syms):
-                            new[f"{letter} SLUMO symmetry"] = syms[homo + 2]
-            else:
-                Es = new["moenergies"][0]
-                homo = homos[0]
-                new["alpha HOMO orbital number"] = homo + 1
-                new["beta HOMO orbital number"] = homo + 1
-                new["E alpha homo"] = Es[homo]
-                new["E beta homo"] = Es[homo]
-                if homo > 0:
-                    new["E alpha nhomo"] = Es[homo - 1]
-                    new["E beta nhomo"] = Es[homo - 1]
-                if homo + 1 < len(Es):
-                    new["E alpha lumo"] = Es[homo + 1]
-                    new["E beta lumo"] = Es[homo + 1]
-                    new["E alpha gap"] = Es[homo + 1] - Es[homo]
-                    new["E beta gap"] = Es[homo + 1] - Es[homo]
-                if homo + 2 < len(Es):
-                    new["E alpha slumo"] = Es[homo + 2]
-                    new["E beta slumo"] = Es[homo + 2]
+            # Restricted calculations have one set of orbitals for both spins
+            spins = ("alpha", 0), ("beta", 1 if len(homos) == 2 else 0)
+            frontier = {-1: "nhomo", 0: "homo", 1: "lumo", 2: "slumo"}
+            for letter, i in spins:
+                homo = homos[i]
+                first = max(homo - 1, 0)
+                new[f"{letter} HOMO orbital number"] = homo + 1
+                # The orbitals from NHOMO to SLUMO, as far as they exist
+                Es = new["moenergies"][i][first : homo + 3]
+                for offset, E in enumerate(Es, start=first - homo):
+                    new[f"E {letter} {frontier[offset]}"] = E
+                if homo >= 0 and homo + 1 - first < len(Es):
+                    new[f"E {letter} gap"] = Es[homo + 1 - first] - Es[homo - first]
                 if "mosyms" in new:
-                    syms = new["mosyms"][0]
-                    new["alpha HOMO symmetry"] = syms[homo]
-                    new["beta HOMO symmetry"] = syms[homo]
-                    if homo > 0:
-                        new["alpha NHOMO symmetry"] = syms[homo - 1]
-                        new["beta NHOMO symmetry"] = syms[homo - 1]
-                    if homo + 1 < len(syms):
-                        new["alpha LUMO symmetry"] = syms[homo + 1]
-                        new["beta LUMO symmetry"] = syms[homo + 1]
-                    if homo + 2 < len(syms):
-                        new["alpha SLUMO symmetry"] = syms[homo + 2]
-                        new["beta SLUMO symmetry"] = syms[homo + 2]
+                    syms = new["mosyms"][i][first : homo + 3]
+                    for offset, sym in enumerate(syms, start=first - homo):
+                        name = frontier[offset].upper()
+                        new[f"{letter} {name} symmetry"] = sym
 
         # moments
         if "moments" in new:
@@ -1701,12 +2025,17 @@ class Substep(seamm.Node):
         seamm.Node
             The next node object in the flowchart.
         """
+        # Resolve the parameters and configuration afresh for this execution
+        self._cached_P = None
+        self._cached_config = None
+
         # Create the directory
         directory = Path(self.directory)
         directory.mkdir(parents=True, exist_ok=True)
 
         # Check for successful run, don't rerun
         success_file = directory / "success.dat"
+        result = None
         if not success_file.exists():
             # Get the system & configuration
             system, configuration = self.get_system_configuration(None)
@@ -1719,22 +2048,7 @@ class Substep(seamm.Node):
             ce = seamm_exec.computational_environment()
 
             # How many threads to use
-            n_cores = ce["NTASKS"]
-            self.logger.debug("The number of cores available is {}".format(n_cores))
-
-            if seamm_options["parallelism"] not in ("openmp", "any"):
-                n_threads = 1
-            else:
-                if options["ncores"] == "available":
-                    n_threads = n_cores
-                else:
-                    n_threads = int(options["ncores"])
-                if n_threads > n_cores:
-                    n_threads = n_cores
-                if n_threads < 1:
-                    n_threads = 1
-                if seamm_options["ncores"] != "available":
-                    n_threads = min(n_threads, int(seamm_options["ncores"]))
+            n_threads = self._n_threads(ce)
             ce["NTASKS"] = n_threads
             self.logger.debug(f"Gaussian will use {n_threads} threads.")
 
@@ -1775,25 +2089,24 @@ class Substep(seamm.Node):
                 if last_chkpoint.exists():
                     lines.append(f"%OldChk={last_chkpoint}")
             chkpoint = directory.parent / f"{step_no}.chk"
-            lines.append("%Chk=gaussian.chk")
-            lines.append(f"%Mem={memory}")
-            lines.append(f"%NProcShared={n_threads}")
-
-            lines.append("# " + " ".join(keywords))
-            lines.append("# Punch=(Coord,Derivatives)")
+            lines.extend(_deck_header(tuple(sorted(keywords)), memory, n_threads))
 
-            lines.append(" ")
-            lines.append(f"{self.title} of {system.name}/{configuration.name}")
-            lines.append(" ")
-            lines.append(f"{configuration.charge}    {configuration.spin_multiplicity}")
-
-            # Atoms with coordinates
+            # Title, charge and multiplicity, then the atoms with coordinates
             symbols = configuration.atoms.symbols
             XYZs = configuration.atoms.coordinates
-            for symbol, xyz in zip(symbols, XYZs):
-                x, y, z = xyz
-                lines.append(f"{symbol:2}   {x:10.6f} {y:10.6f} {z:10.6f}")
-            lines.append(" ")
+            lines.extend(
+                (
+                    " ",
+                    f"{self.title} of {system.name}/{configuration.name}",
+                    " ",
+                    f"{configuration.charge}    {configuration.spin_multiplicity}",
+                    "\n".join(
+                        f"{symbol:2}   {x:10.6f} {y:10.6f} {z:10.6f}"
+                        for symbol, (x, y, z) in zip(symbols, XYZs)
+                    ),
+                    " ",
+                )
+            )
 
             for section in (
                 "Initial force constants",
@@ -1802,8 +2115,10 @@ class Substep(seamm.Node):
                 if section in extra_sections:
                     lines.extend(extra_sections[section])
 
-            files = {"input.dat": "\n".join(lines)}
-            self.logger.debug("input.dat:\n" + files["input.dat"])
+            # Encoded once here; both the executor and write_bytes take it as is
+            files = {"input.dat": "\n".join(lines).encode()}
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("input.dat:\n" + files["input.dat"].decode())
 
             printer.important(
                 self.indent + f"    Gaussian will use {n_threads} OpenMP threads and "
@@ -1813,117 +2128,35 @@ class Substep(seamm.Node):
                 # Just write the input files and stop
                 for filename in files:
                     path = directory / filename
-                    path.write_text(files[filename])
+                    path.write_bytes(files[filename])
                 data = {}
             else:
                 executor = self.parent.flowchart.executor
 
-                # Read configuration file for Gaussian if it exists
-                executor_type = executor.name
-                full_config = configparser.ConfigParser()
-                ini_dir = Path(seamm_options["root"]).expanduser()
-                path = ini_dir / "gaussian.ini"
-
-                # If the config file doesn't exist, get the default
-                if not path.exists():
-                    resources = importlib.resources.files("gaussian_step") / "data"
-                    ini_text = (resources / "gaussian.ini").read_text()
-                    txt_config = Configuration(path)
-                    txt_config.from_string(ini_text)
-                    txt_config.save()
-
-                full_config.read(ini_dir / "gaussian.ini")
-
-                # Getting desperate! Look for an executable in the path
-                if (
-                    executor_type not in full_config
-                    or "root-directory" not in full_config[executor_type]
-                    or "setup-environment" not in full_config[executor_type]
-                ):
-                    # See if we can find the Gaussian environment variables
-                    if "g16root" in os.environ:
-                        g_ver = "g16"
-                        root_directory = os.environ["g16root"]
-                        if "GAUSS_BSDDIR" in os.environ:
-                            setup_directory = Path(os.environ["GAUSS_BSDDIR"])
-                        else:
-                            setup_directory = Path(root_directory) / g_ver / "bsd"
-                    elif "g09root" in os.environ:
-                        g_ver = "g09"
-                        root_directory = os.environ["g09root"]
-                        if "GAUSS_BSDDIR" in os.environ:
-                            setup_directory = Path(os.environ["GAUSS_BSDDIR"])
-                        else:
-                            setup_directory = Path(root_directory) / g_ver / "bsd"
-                    else:
-                        root_directory = None
-                        exe_path = shutil.which("g16")
-                        if exe_path is None:
-                            exe_path = shutil.which("g09")
-                        if exe_path is None:
-                            raise RuntimeError(
-                                f"No section for '{executor_type}' in Gaussian ini file"
-                                f" ({ini_dir / 'gaussian.ini'}), nor in the defaults, "
-                                "nor in the path!"
-                            )
-                        g_ver = exe_path.name
-                        root_directory = str(exe_path.parent.parent)
-                        setup_directory = Path(root_directory) / g_ver / "bsd"
-                    setup_environment = str(setup_directory / f"{g_ver}.profile")
-
-                    txt_config = Configuration(path)
-
-                    if not txt_config.section_exists(executor_type):
-                        txt_config.add_section(executor_type)
-
-                    txt_config.set_value(executor_type, "installation", "local")
-                    txt_config.set_value(executor_type, "code", g_ver)
-                    txt_config.set_value(
-                        executor_type, "root-directory", root_directory
-                    )
-                    txt_config.set_value(
-                        executor_type, "setup-environment", setup_environment
-                    )
-                    txt_config.save()
-                    full_config.read(ini_dir / "gaussian.ini")
-
-                config = dict(full_config.items(executor_type))
-                # Use the matching version of the seamm-gaussian image by default.
-                config["version"] = self.version
-
+                config, env = self._gaussian_config(executor)
                 g_ver = config["code"]
 
-                # Setup the calculation environment definition
-                if config["root-directory"] != "":
-                    env = {f"{g_ver}root": config["root-directory"]}
-                else:
-                    env = {}
-
                 if config["setup-environment"] != "":
                     cmd = f". {config['setup-environment']} ; {g_ver}"
                 else:
                     cmd = g_ver
 
-                if "scratch-dir" in config and config["scratch-dir"] != "":
-                    path = Path(config["scratch-dir"])
-                    try:
-                        path.mkdir(parents=True, exist_ok=True)
-                    except Exception:
-                        pass
-                    else:
-                        env["GAUSS_SCRDIR"] = config["scratch-dir"]
-
                 cmd += " < input.dat > output.txt && formchk gaussian.chk"
 
-                return_files = [
-                    "output.txt",
-                    "gaussian.chk",
-                    "gaussian.fchk",
-                    "fort.7",
-                ]
+                # The checkpoint file is only needed by a following substep, via
+                # %OldChk. If there is none and it would be removed at the end anyway,
+                # don't return it, so the executor neither reads it nor keeps it.
+                keep_chk = (
+                    self.next() is not None
+                    or self._P()["file handling"] != "remove checkpoint files"
+                )
 
-                self.logger.debug(f"{cmd=}")
-                self.logger.debug(f"{env=}")
+                return_files = ["output.txt", "gaussian.fchk", "fort.7"]
+                if keep_chk:
+                    return_files.append("gaussian.chk")
+
+                self.logger.debug("cmd=%r", cmd)
+                self.logger.debug("env=%r", env)
 
                 self._timing_data[12] = " ".join(keywords)
                 self._timing_data[5] = datetime.now(timezone.utc).isoformat()
@@ -1959,10 +2192,11 @@ class Substep(seamm.Node):
                     self.logger.error("There was an error running Gaussian")
                     return None
 
-                if chkpoint_ok:
-                    (directory / "gaussian.chk").rename(chkpoint)
-                else:
-                    (directory / "gaussian.chk").unlink(missing_ok=True)
+                if keep_chk:
+                    if chkpoint_ok:
+                        (directory / "gaussian.chk").rename(chkpoint)
+                    else:
+                        (directory / "gaussian.chk").unlink(missing_ok=True)
 
         if not self.input_only:
             # Reget or parse the data
@@ -1972,11 +2206,15 @@ class Substep(seamm.Node):
                     data = json.load(fd)
                 self.model = data["model"][9:]
             else:
-                # And output
+                # And output, read once and shared by cclib and parse_output. Use
+                # the copy the executor returned if there is one.
                 path = directory / "output.txt"
-                if path.exists():
+                output = _returned_text(result, "output.txt")
+                if output is None and path.exists():
+                    output = path.read_text()
+                if output is not None:
                     try:
-                        data = vars(cclib.io.ccread(path))
+                        data = vars(cclib.io.ccread(_text_stream(output)))
                         data = self.process_data(data)
                     except Exception as e:
                         self.logger.warning(
@@ -2004,17 +2242,20 @@ class Substep(seamm.Node):
                 data["SEAMM elapsed time"] = round(t, 1)
                 data["SEAMM np"] = n_threads
 
-                self.logger.debug("after cclib")
-                self.logger.debug(f"{pprint.pformat(data)}")
-                self.logger.debug(80 * "*")
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("after cclib")
+                    self.logger.debug(pprint.pformat(data))
+                    self.logger.debug(80 * "*")
 
                 success = "success" if "success" in data else False
 
                 if not success:
                     raise RuntimeError("Gaussian did not complete successfully")
 
-                # Get the data from the formatted checkpoint file
-                data = self.parse_fchk(directory / "gaussian.fchk", data)
+                # Get the data from the formatted checkpoint file, using the copy
+                # the executor returned if there is one.
+                fchk = _returned_text(result, "gaussian.fchk")
+                data = self.parse_fchk(directory / "gaussian.fchk", data, text=fchk)
 
                 # Debug output
                 if self.logger.isEnabledFor(logging.DEBUG):
@@ -2024,13 +2265,16 @@ class Substep(seamm.Node):
                     self.logger.debug(f"Data:\n{pprint.pformat(data)}")
 
                 # And parse a bit more out of the output
-                if path.exists():
-                    data = self.parse_output(path, data)
-
-                # And the Punch file, if it exists
-                punch = Path(directory / "fort.7")
-                if punch.exists():
-                    data = self.parse_punch(punch, configuration.n_atoms, data)
+                if output is not None:
+                    data = self.parse_output(path, data, text=output)
+
+                # And the Punch file, if it exists, again preferring the returned copy
+                punch = directory / "fort.7"
+                punch_text = _returned_text(result, "fort.7")
+                if punch_text is not None or punch.exists():
+                    data = self.parse_punch(
+                        punch, configuration.n_atoms, data, text=punch_text
+                    )
 
                 # The model chemistry
                 if "model" in data:
@@ -2122,11 +2366,11 @@ class Substep(seamm.Node):
         # similar to the above to actually add the citation to the references.
         if "G version" in data:
             try:
-                template = string.Template(self._bibliography[data["G version"]])
-                citation = template.substitute(
-                    month=data["G month"],
-                    version=data["G revision"],
-                    year=data["G year"],
+                citation = _gaussian_citation(
+                    self._bibliography[data["G version"]],
+                    data["G month"],
+                    data["G revision"],
+                    data["G year"],
                 )
                 self.references.cite(
                     raw=citation,
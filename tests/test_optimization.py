@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the maximum number of steps and the analysis of an optimization."""
+
+import types
+
+import pytest
+
+import gaussian_step
+from gaussian_step.optimization import _max_steps
+import seamm
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("6*nAtoms", 60),
+        ("9*nAtoms", 90),
+        (" 6 * nAtoms ", 60),
+        ("100", 100),
+    ],
+)
+def test_max_steps(value, expected):
+    """The enumerated multiples of the number of atoms, and plain integers."""
+    assert _max_steps(value, 10) == expected
+
+
+@pytest.mark.parametrize("value", ["nAtoms*6", "nAtoms", "6*natoms", "6.5", "lots"])
+def test_max_steps_rejected(value):
+    """Only 'k*nAtoms' and integers are accepted, not general expressions."""
+    with pytest.raises(ValueError, match="must be an integer or of the form"):
+        _max_steps(value, 10)
+
+
+def test_analyze_not_converged(monkeypatch):
+    """The convergence table is printed for an optimization that did not converge."""
+    if seamm.flowchart_variables is None:
+        monkeypatch.setattr(
+            seamm, "flowchart_variables", types.SimpleNamespace(_data={})
+        )
+    node = gaussian_step.Optimization()
+    node._id = (1, 1)
+    configuration = types.SimpleNamespace(n_atoms=3)
+    monkeypatch.setattr(
+        node, "get_system_configuration", lambda *args: (None, configuration)
+    )
+    monkeypatch.setattr(gaussian_step.Energy, "analyze", lambda *args, **kwargs: None)
+    lines = []
+    monkeypatch.setattr(
+        gaussian_step.optimization.printer, "normal", lambda text: lines.append(text)
+    )
+
+    data = {
+        "energy": -76.4,
+        "N steps optimization": 2,
+        "optimization is converged": False,
+    }
+    for key, threshold in (
+        ("maximum atom force", 0.00045),
+        ("RMS atom force", 0.0003),
+        ("maximum atom displacement", 0.0018),
+        ("RMS atom displacement", 0.0012),
+    ):
+        data[key + " trajectory"] = [0.1, 0.01]
+        data[key + " threshold"] = threshold
+    P = {"target": "minimum", "ignore unconverged optimization": True}
+    node.analyze(data=data, P=P)
+
+    table = "\n".join(str(line) for line in lines)
+    assert "did not converge in 2 steps" in table
+    assert "Convergence" in table
+    assert "0.000450" in table
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for parsing the Gaussian output and formatted checkpoint files."""
+
+from pathlib import Path
+import re
+import types
+
+import numpy as np
+import pytest
+
+import gaussian_step
+import seamm
+
+data_dir = Path(__file__).resolve().parent / "data"
+
+
+@pytest.fixture
+def substep(monkeypatch):
+    """An Energy substep for water, outside of any flowchart."""
+    if seamm.flowchart_variables is None:
+        monkeypatch.setattr(
+            seamm, "flowchart_variables", types.SimpleNamespace(_data={})
+        )
+    node = gaussian_step.Energy()
+    atoms = types.SimpleNamespace(symbols=["O", "H", "H"], atomic_numbers=[8, 1, 1])
+    configuration = types.SimpleNamespace(atoms=atoms)
+    monkeypatch.setattr(
+        node, "get_system_configuration", lambda *args: (None, configuration)
+    )
+    return node
+
+
+def parse_log(node, filename, method, text=None):
+    node.parameters["method"].value = method
+    path = data_dir / filename
+    return node.parse_output(path, {}, text=text)
+
+
+def test_output_cbs(substep):
+    """The last thermochemistry and CBS blocks are the ones used."""
+    data = parse_log(substep, "cbs-qb3.log", "CBS-QB3")
+
+    assert data["success"] is True
+    assert data["G version"] == "G16"
+    assert data["G revision"] == "C.01"
+    assert data["model"] == "CBS-QB3"
+
+    # Thermochemistry, from the second block
+    assert data["T"] == 298.15
+    assert data["P"] == 1.0
+    assert data["symmetry number"] == 2
+    assert data["H thermal"] == 0.0252
+    assert data["G thermal"] == 0.0032
+    assert data["E T"] == -76.372
+
+    # CBS extrapolation, from the second block
+    assert data["H 0"] == -78.439922
+    assert data["H"] == -78.435964
+    assert data["G"] == -78.460753
+    assert data["E scf"] == -78.059017
+    assert data["deltaE mp2"] == -0.281841
+    assert data["Composite/summary"].startswith(" Complete Basis Set (CBS)")
+    assert len(data["citations"]) == 2
+
+
+def test_output_gn(substep):
+    """The last thermochemistry and Gn blocks are the ones used."""
+    data = parse_log(substep, "g4.log", "G4")
+
+    assert data["success"] is True
+    assert data["G thermal"] == 0.0033
+    assert data["H 0"] == -78.521882
+    assert data["H"] == -78.517880
+    assert data["G"] == -78.542752
+
+
+def test_output_optimization(substep):
+    """The convergence of the optimization and the bond orders."""
+    data = parse_log(substep, "cbs-qb3.log", "CBS-QB3")
+
+    assert data["N steps optimization"] == 2
+    assert data["optimization is converged"] is True
+    assert data["maximum atom force trajectory"] == [0.1, 0.0001]
+    assert data["RMS atom displacement trajectory"] == [0.1, 0.0001]
+    assert data["maximum atom force threshold"] == 0.00045
+    assert data["Wiberg bond order matrix"] == [
+        [0.0, 0.9, 0.9],
+        [0.9, 0.0, 0.01],
+        [0.9, 0.01, 0.0],
+    ]
+
+
+def test_output_text(substep):
+    """Passing the text gives the same results as reading the file."""
+    text = (data_dir / "cbs-qb3.log").read_text()
+    assert parse_log(substep, "cbs-qb3.log", "CBS-QB3", text=text) == parse_log(
+        substep, "cbs-qb3.log", "CBS-QB3"
+    )
+
+
+def test_output_error(substep):
+    """Success is only taken from the final line of the output."""
+    data = parse_log(substep, "error.log", "HF")
+
+    assert data["success"] is False
+    assert data["N steps optimization"] == 1
+    assert data["optimization is converged"] is False
+    assert "T" not in data
+    assert "H 0" not in data
+
+
+def test_output_truncated(substep):
+    """A log without its final line did not succeed, but is still parsed."""
+    text = (data_dir / "cbs-qb3.log").read_text()
+    text = text[: text.index(" Normal termination")]
+    data = parse_log(substep, "cbs-qb3.log", "CBS-QB3", text=text)
+
+    assert data["success"] is False
+    assert data["H 0"] == -78.439922
+
+
+def test_fchk(substep):
+    """Scalars and arrays of each type, including 3-digit exponents."""
+    data = substep.parse_fchk(data_dir / "water.fchk")
+
+    assert data["calculation"] == "SP"
+    assert data["method"] == "RB3LYP"
+    assert data["Number of atoms"] == 3
+    assert data["Charge"] == 0
+    assert data["energy"] == -76.4089
+    assert data["Atomic numbers"] == [8, 1, 1]
+    assert data["Current cartesian coordinates"][2] == 0.22166558
+    assert data["gradients"] == [
+        1.0e-100,
+        0.0,
+        1.23456789e-03,
+        -2.5e-120,
+        3.0e-04,
+        -6.17283945e-04,
+        0.0,
+        -3.0e-04,
+        -6.17283945e-04,
+    ]
+    assert data["Frozen"] == [False, True, False]
+    assert data["Title text"].rstrip() == "Watermolecule"
+
+
+def test_fchk_line_endings(substep):
+    """CRLF line endings and a missing final newline give the same results."""
+    text = (data_dir / "water.fchk").read_text()
+    expected = substep.parse_fchk(None, text=text)
+
+    assert substep.parse_fchk(None, text=text.replace("\n", "\r\n")) == expected
+    assert substep.parse_fchk(None, text=text.rstrip("\n")) == expected
+
+
+def test_fchk_truncated(substep):
+    """An incomplete array is skipped, keeping the blocks before it."""
+    text = (data_dir / "water.fchk").read_text()
+    text = "\n".join(text.splitlines()[:12]) + "\n"
+    data = substep.parse_fchk(None, text=text)
+
+    assert data["energy"] == -76.4089
+    assert len(data["Current cartesian coordinates"]) == 9
+    assert "gradients" not in data
+    assert "Frozen" not in data
+
+    assert substep.parse_fchk(None, text="Title only\n") == {}
+
+
+def test_output_gn_after_bond_orders(substep):
+    """Lines read with the bond orders still delimit the Gn summary."""
+    text = (data_dir / "g4.log").read_text()
+    start = text.index(" Wiberg bond index")
+    wiberg = text[start : text.index(" Normal termination")]
+    # Put the bond orders, ending with their blank line, right before the summary
+    lines = text.splitlines(keepends=True)
+    lines[75] = wiberg
+    data = parse_log(substep, "g4.log", "G4", text="".join(lines))
+
+    assert data["H"] == -78.517880
+    summary = data["Composite/summary"]
+    assert " Temperature=" in summary
+    assert "Wiberg" not in summary
+    assert "Free Energies=" not in summary
+
+
+def test_fchk_text_like_header(substep):
+    """A line of character data that looks like a header is still data."""
+    route = "#P B3LYP/6-31G(d) Opt Freq SCF=Tight Int   A   Ultrafine Pop=Full NBO"
+    block = f"{'Route':43s}C   N={10:12d}\n{route[:60]}\n{route[60:]:60s}\n"
+    text = (data_dir / "water.fchk").read_text()
+    lines = text.splitlines(keepends=True)
+    lines.insert(5, block)
+    data = substep.parse_fchk(None, text="".join(lines))
+
+    assert data["Route"].rstrip() == route
+    assert data["Atomic numbers"] == [8, 1, 1]
+    assert data["Frozen"] == [False, True, False]
+
+
+def test_frontier_orbitals(substep):
+    """The frontier orbitals of each spin, even with no electrons of one spin."""
+    data = {
+        "homos": np.array([1, -1]),
+        "moenergies": [np.array([-20.0, -10.0, 1.0, 2.0]), np.array([3.0, 4.0, 5.0])],
+        "mosyms": [["A1", "B2", "A1", "B1"], ["A1", "B2", "A1"]],
+    }
+    new = substep.process_data(data)
+
+    assert new["alpha HOMO orbital number"] == 2
+    assert new["E alpha nhomo"] == -20.0
+    assert new["E alpha homo"] == -10.0
+    assert new["E alpha lumo"] == 1.0
+    assert new["E alpha slumo"] == 2.0
+    assert new["E alpha gap"] == 11.0
+    assert new["alpha LUMO symmetry"] == "A1"
+    assert new["alpha SLUMO symmetry"] == "B1"
+
+    # No beta electrons, so no HOMO, but the first orbital is the LUMO
+    assert new["beta HOMO orbital number"] == 0
+    assert "E beta homo" not in new
+    assert "E beta gap" not in new
+    assert new["E beta lumo"] == 3.0
+    assert new["E beta slumo"] == 4.0
+    assert new["beta LUMO symmetry"] == "A1"
+    assert "beta HOMO symmetry" not in new
+
+
+def test_selected_orbitals(substep, monkeypatch, tmp_path):
+    """Overlapping selections run CUBEGEN once per orbital, within limits."""
+    P = {
+        "total density": False,
+        "total spin density": False,
+        "orbitals": True,
+        "selected orbitals": "HOMO-5:HOMO, HOMO:LUMO+1, LUMO, LUMO+10",
+    }
+    commands = []
+
+    def run(cmd, **kwargs):
+        commands.extend(cmd)
+        return {"stdout": ""}
+
+    executor = types.SimpleNamespace(run=run)
+    substep.parent = types.SimpleNamespace(
+        flowchart=types.SimpleNamespace(executor=executor)
+    )
+    monkeypatch.setattr(type(substep), "directory", str(tmp_path))
+    monkeypatch.setattr(substep, "_P", lambda: P)
+    monkeypatch.setattr(substep, "_n_threads", lambda ce: 1)
+    monkeypatch.setattr(
+        substep, "_gaussian_config", lambda executor: ({"setup-environment": ""}, {})
+    )
+    substep.get_system_configuration(None)[1].periodicity = 0
+
+    substep.make_plots({"homos": [4], "nmo": 7})
+
+    assert len(commands) == 1
+    assert re.findall(r"MO=(\d+) gaussian.fchk (\S+)", commands[0]) == [
+        ("1", "HOMO-4.cube"),
+        ("2", "HOMO-3.cube"),
+        ("3", "HOMO-2.cube"),
+        ("4", "HOMO-1.cube"),
+        ("5", "HOMO.cube"),
+        ("6", "LUMO.cube"),
+        ("7", "LUMO+1.cube"),
+    ]